@@ -1,6 +1,9 @@
 from __future__ import annotations
 
-from collections import defaultdict
+from collections.abc import Iterable
+from datetime import date
+from itertools import groupby
+from operator import itemgetter
 
 from stocks_analysis.models import (
     Snapshot,
@@ -11,53 +14,69 @@ from stocks_analysis.models import (
 
 def parse_snapshots_from_rows(rows: list[list[str]]) -> list[Snapshot]:
     """Parse raw Holdings sheet rows into Snapshots grouped and sorted by date."""
-    if not rows:
-        return []
+    # ISO dates sort lexicographically in chronological order, so a single sort on
+    # the raw date column lets groupby() build each snapshot in one linear pass.
+    by_date = itemgetter(0)
+    snapshots: list[Snapshot] = []
+    for date_str, group in groupby(sorted(rows, key=by_date), key=by_date):
+        snapshot_date = date.fromisoformat(date_str)
+        holdings = SnapshotHolding.from_sheet_rows(list(group), snapshot_date)
+        snapshots.append(Snapshot(date=snapshot_date, holdings=holdings))
+    return snapshots
 
-    by_date: dict[str, list[SnapshotHolding]] = defaultdict(list)
-    for row in rows:
-        sh = SnapshotHolding.from_sheet_row(row)
-        by_date[sh.date.isoformat()].append(sh)
 
-    snapshots = [
-        Snapshot(date=holdings[0].date, holdings=holdings) for holdings in by_date.values()
-    ]
-    snapshots.sort(key=lambda s: s.date)
-    return snapshots
+def _estimate_buy_price(
+    prev_qty: int, prev_avg_cost: float, curr_qty: int, curr_avg_cost: float
+) -> float:
+    """Back out the price paid for the extra shares from the change in total cost.
+
+    Falls back to the new avg_cost when the estimate is not positive (e.g. after a
+    corporate action rewrites avg_cost).
+    """
+    price = (curr_avg_cost * curr_qty - prev_avg_cost * prev_qty) / (curr_qty - prev_qty)
+    return price if price > 0 else curr_avg_cost
 
 
 def _infer_between_snapshots(prev: Snapshot, curr: Snapshot) -> list[Transaction]:
     """Compare two consecutive snapshots and infer transactions."""
     prev_map = {h.instrument: h for h in prev.holdings}
     curr_map = {h.instrument: h for h in curr.holdings}
+    txn_date = curr.date
     txns: list[Transaction] = []
 
-    # Check for new or changed instruments
+    # Check for new or changed instruments; matched entries are popped so that
+    # whatever remains in prev_map afterwards is exactly the disappeared set.
     for instrument, curr_h in curr_map.items():
-        prev_h = prev_map.get(instrument)
+        curr_qty = curr_h.quantity
+        prev_h = prev_map.pop(instrument, None)
         if prev_h is None:
             # New instrument → BUY at avg_cost
+            curr_avg_cost = curr_h.avg_cost
             txns.append(
                 Transaction(
-                    date=curr.date,
+                    date=txn_date,
                     instrument=instrument,
                     type="BUY",
-                    quantity=curr_h.quantity,
-                    price=curr_h.avg_cost,
-                    amount=-(curr_h.avg_cost * curr_h.quantity),
+                    quantity=curr_qty,
+                    price=curr_avg_cost,
+                    amount=-(curr_avg_cost * curr_qty),
                 )
             )
-        elif curr_h.quantity > prev_h.quantity:
+            continue
+
+        prev_qty = prev_h.quantity
+        if curr_qty == prev_qty:
+            # Unchanged position (the common case) → no transaction
+            continue
+        if curr_qty > prev_qty:
             # Quantity increased → BUY additional
-            qty_diff = curr_h.quantity - prev_h.quantity
-            estimated_price = (
-                curr_h.avg_cost * curr_h.quantity - prev_h.avg_cost * prev_h.quantity
-            ) / qty_diff
-            if estimated_price <= 0:
-                estimated_price = curr_h.avg_cost
+            qty_diff = curr_qty - prev_qty
+            estimated_price = _estimate_buy_price(
+                prev_qty, prev_h.avg_cost, curr_qty, curr_h.avg_cost
+            )
             txns.append(
                 Transaction(
-                    date=curr.date,
+                    date=txn_date,
                     instrument=instrument,
                     type="BUY",
                     quantity=qty_diff,
@@ -65,60 +84,65 @@ def _infer_between_snapshots(prev: Snapshot, curr: Snapshot) -> list[Transaction
                     amount=-(estimated_price * qty_diff),
                 )
             )
-        elif curr_h.quantity < prev_h.quantity:
+        else:
             # Quantity decreased → SELL at previous LTP
-            qty_diff = prev_h.quantity - curr_h.quantity
+            qty_diff = prev_qty - curr_qty
+            prev_ltp = prev_h.ltp
             txns.append(
                 Transaction(
-                    date=curr.date,
+                    date=txn_date,
                     instrument=instrument,
                     type="SELL",
                     quantity=qty_diff,
-                    price=prev_h.ltp,
-                    amount=prev_h.ltp * qty_diff,
+                    price=prev_ltp,
+                    amount=prev_ltp * qty_diff,
                 )
             )
-        # else: unchanged, no transaction
 
-    # Check for disappeared instruments → SELL all at previous LTP
+    # Disappeared instruments → SELL all at previous LTP
     for instrument, prev_h in prev_map.items():
-        if instrument not in curr_map:
-            txns.append(
-                Transaction(
-                    date=curr.date,
-                    instrument=instrument,
-                    type="SELL",
-                    quantity=prev_h.quantity,
-                    price=prev_h.ltp,
-                    amount=prev_h.ltp * prev_h.quantity,
-                )
+        txns.append(
+            Transaction(
+                date=txn_date,
+                instrument=instrument,
+                type="SELL",
+                quantity=prev_h.quantity,
+                price=prev_h.ltp,
+                amount=prev_h.ltp * prev_h.quantity,
             )
+        )
 
     return txns
 
 
-def infer_transactions(snapshots: list[Snapshot]) -> list[Transaction]:
-    """Infer all transactions from a chronologically-sorted list of snapshots."""
-    if not snapshots:
-        return []
+def infer_transactions(snapshots: Iterable[Snapshot]) -> list[Transaction]:
+    """Infer all transactions from chronologically-sorted snapshots.
 
-    txns: list[Transaction] = []
+    Snapshots are consumed one at a time and only the previous one is kept,
+    so a lazy iterable works as well as a list.
+    """
+    snapshot_iter = iter(snapshots)
+    first = next(snapshot_iter, None)
+    if first is None:
+        return []
 
     # First snapshot: BUY everything at avg_cost
-    for h in snapshots[0].holdings:
-        txns.append(
-            Transaction(
-                date=snapshots[0].date,
-                instrument=h.instrument,
-                type="BUY",
-                quantity=h.quantity,
-                price=h.avg_cost,
-                amount=-(h.avg_cost * h.quantity),
-            )
+    txns = [
+        Transaction(
+            date=first.date,
+            instrument=h.instrument,
+            type="BUY",
+            quantity=h.quantity,
+            price=h.avg_cost,
+            amount=-(h.avg_cost * h.quantity),
         )
+        for h in first.holdings
+    ]
 
     # Subsequent snapshots: diff with previous
-    for i in range(1, len(snapshots)):
-        txns.extend(_infer_between_snapshots(snapshots[i - 1], snapshots[i]))
+    prev = first
+    for curr in snapshot_iter:
+        txns.extend(_infer_between_snapshots(prev, curr))
+        prev = curr
 
     return txns
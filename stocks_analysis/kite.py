@@ -22,6 +22,27 @@ _DATA_LABELS: dict[str, str] = {
     "Day chg.": "day_change_percent",
 }
 
+# Runs in the browser and returns every labelled cell of one holdings row.
+_ROW_CELLS_JS = """
+row => Array.from(row.querySelectorAll("td[data-label]"), (td) => {
+    const name = td.dataset.label === "Instrument" ? td.querySelector("a span:first-child") : null;
+    const tooltip = td.querySelector("span[data-tooltip-content]");
+    return {
+        label: td.dataset.label,
+        text: (name || td).innerText,
+        tooltip: tooltip ? tooltip.getAttribute("data-tooltip-content") : null,
+    };
+})
+"""
+# Whole holdings table in a single CDP round trip instead of one (or more) per row.
+_HOLDINGS_CELLS_JS = f"rows => rows.map({_ROW_CELLS_JS.strip()})"
+
+# Qty. cell tokens: T-day settlement labels (T1:, T2:, ...) or comma-grouped numbers
+_QUANTITY_TOKEN = re.compile(r"T\d+:|([\d,]+)")
+
+# Thousands separators, percent and explicit plus signs, dropped in one translate() pass
+_NUMBER_NOISE = str.maketrans("", "", ",%+")
+
 
 def _parse_quantity(text: str) -> int:
     """Parse quantity text that may contain T1/T2 settlement annotations.
@@ -29,15 +50,13 @@ def _parse_quantity(text: str) -> int:
     Kite shows settlement info in the Qty cell, e.g. "T1: 3 3" where
     3 shares are awaiting T1 delivery and 3 are settled. Total = 6.
     """
-    # Strip T-day labels (T1:, T2:, etc.), then sum all remaining numbers
-    cleaned = re.sub(r"T\d+:", "", text)
-    numbers = re.findall(r"[\d,]+", cleaned)
-    return sum(int(n.replace(",", "")) for n in numbers)
+    # T-day labels match the first alternative and capture "", so they drop out
+    numbers = _QUANTITY_TOKEN.findall(text)
+    return sum(int(n.replace(",", "")) for n in numbers if n)
 
 
 def _clean_number(text: str) -> float:
-    cleaned = text.replace(",", "").replace("%", "").replace("+", "").strip()
-    return float(cleaned)
+    return float(text.translate(_NUMBER_NOISE))
 
 
 def _parse_tooltip_value(tooltip: str) -> str:
@@ -45,27 +64,21 @@ def _parse_tooltip_value(tooltip: str) -> str:
     return tooltip.split("(")[0].strip() if tooltip else "0"
 
 
-def _extract_row_data(row: object) -> dict[str, str]:
-    """Extract holding data from a table row element using data-label selectors."""
+def _row_data_from_cells(cells: list[dict[str, str | None]]) -> dict[str, str]:
+    """Map the labelled cells of one holdings row (see _ROW_CELLS_JS) to holding fields."""
+    # First cell per label wins, like query_selector, in case a label is repeated
+    by_label: dict[str | None, dict[str, str | None]] = {}
+    for cell in cells:
+        by_label.setdefault(cell["label"], cell)
     data: dict[str, str] = {}
     for label, field in _DATA_LABELS.items():
-        cell = row.query_selector(f'td[data-label="{label}"]')
+        cell = by_label.get(label)
         if cell is None:
             raise ValueError(f"Missing cell: {label}")
-        if label == "Instrument":
-            name_el = cell.query_selector("a span:first-child")
-            data[field] = (name_el or cell).inner_text().strip()
-        else:
-            data[field] = cell.inner_text().strip()
+        data[field] = (cell["text"] or "").strip()
 
     # day_change absolute value from Day chg. tooltip
-    tooltip_el = row.query_selector('td[data-label="Day chg."] span[data-tooltip-content]')
-    if tooltip_el:
-        tooltip = tooltip_el.get_attribute("data-tooltip-content") or ""
-        data["day_change"] = _parse_tooltip_value(tooltip)
-    else:
-        data["day_change"] = "0"
-
+    data["day_change"] = _parse_tooltip_value(by_label["Day chg."]["tooltip"] or "")
     return data
 
 
@@ -86,6 +99,8 @@ def parse_holding_row(row_data: dict[str, str]) -> Holding:
 class KiteFetcher:
     def __init__(self, page: object) -> None:
         self.page = page
+        # Locators are lazy (resolved on each use), so one can be built up front and reused
+        self._holding_rows = page.locator(_HOLDINGS_ROW_SELECTOR)
 
     def open_login_page(self) -> None:
         self.page.goto(KITE_LOGIN_URL)
@@ -108,11 +123,11 @@ class KiteFetcher:
         self.page.wait_for_selector(".holdings .su-loader", state="hidden", timeout=60_000)
 
     def fetch_holdings(self) -> list[Holding]:
-        rows = self.page.query_selector_all(_HOLDINGS_ROW_SELECTOR)
+        rows = self._holding_rows.evaluate_all(_HOLDINGS_CELLS_JS)
         holdings: list[Holding] = []
-        for row in rows:
+        for cells in rows:
             try:
-                row_data = _extract_row_data(row)
+                row_data = _row_data_from_cells(cells)
                 holdings.append(parse_holding_row(row_data))
             except (ValueError, KeyError, IndexError):
                 logger.warning("Skipping malformed row", exc_info=True)
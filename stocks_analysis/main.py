@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 import argparse
 import csv
 import logging
@@ -7,17 +9,21 @@ from collections.abc import Generator
 from contextlib import contextmanager
 from datetime import UTC, date, datetime
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from dotenv import load_dotenv
 
 from stocks_analysis.analysis import infer_transactions, parse_snapshots_from_rows
 from stocks_analysis.kite import KiteFetcher
 from stocks_analysis.models import Holding, PortfolioSummary
-from stocks_analysis.sheets import create_sheets_client
+
+if TYPE_CHECKING:
+    from stocks_analysis.sheets import SheetsClient
 
 logger = logging.getLogger(__name__)
 
 _DEFAULT_OUTPUT_DIR = Path("output")
+_FILENAME_DATE_RE = re.compile(r"holdings_(\d{4})(\d{2})(\d{2})_\d{6}")
 
 
 def save_holdings_to_csv(holdings: list[Holding], output_dir: Path | None = None) -> Path:
@@ -27,18 +33,17 @@ def save_holdings_to_csv(holdings: list[Holding], output_dir: Path | None = None
     timestamp = datetime.now(tz=UTC).strftime("%Y%m%d_%H%M%S")
     filepath = output_dir / f"holdings_{timestamp}.csv"
 
-    with open(filepath, "w", newline="") as f:
+    with filepath.open("w", newline="") as f:
         writer = csv.writer(f)
         writer.writerow(Holding.csv_headers())
-        for holding in holdings:
-            writer.writerow(holding.to_csv_row())
+        writer.writerows(holding.to_csv_row() for holding in holdings)
 
     return filepath
 
 
 def load_holdings_from_csv(filepath: Path) -> list[Holding]:
     """Read a CSV file (with header) and return a list of Holdings."""
-    with open(filepath, newline="") as f:
+    with filepath.open(newline="") as f:
         reader = csv.reader(f)
         next(reader)  # skip header
         return [Holding.from_csv_row(row) for row in reader]
@@ -57,6 +62,13 @@ def create_kite_fetcher() -> Generator[KiteFetcher]:
             browser.close()
 
 
+def create_sheets_client() -> SheetsClient:
+    # gspread and its Google auth stack dominate CLI start-up, so load them only when needed.
+    from stocks_analysis.sheets import create_sheets_client as _create_sheets_client
+
+    return _create_sheets_client()
+
+
 def _upload_to_sheets_if_configured(holdings: list[Holding]) -> None:
     if not os.environ.get("GOOGLE_SHEETS_CREDENTIALS") or not os.environ.get("GOOGLE_SHEET_ID"):
         return
@@ -76,7 +88,7 @@ def _extract_date_from_filename(filepath: Path) -> str:
 
     Falls back to today's date if the filename doesn't match the expected pattern.
     """
-    match = re.match(r"holdings_(\d{4})(\d{2})(\d{2})_\d{6}", filepath.stem)
+    match = _FILENAME_DATE_RE.match(filepath.stem)
     if match:
         return f"{match.group(1)}-{match.group(2)}-{match.group(3)}"
     return date.today().isoformat()
@@ -1,10 +1,32 @@
 from __future__ import annotations
 
+from collections.abc import Callable
 from dataclasses import dataclass, fields
 from datetime import date
+from functools import cache
+from itertools import repeat
+from operator import attrgetter
+from sys import intern
 
 
-@dataclass
+@cache
+def _field_names(cls: type) -> tuple[str, ...]:
+    """Dataclass field names in declaration order, computed once per class."""
+    return tuple(f.name for f in fields(cls))
+
+
+@cache
+def _row_getter(cls: type) -> Callable[[object], tuple[object, ...]]:
+    """Getter returning every field value of an instance as a tuple."""
+    names = _field_names(cls)
+    getter = attrgetter(*names)
+    if len(names) > 1:
+        return getter
+    # attrgetter with a single name returns the bare value, not a 1-tuple
+    return lambda obj: (getter(obj),)
+
+
+@dataclass(slots=True)
 class Holding:
     instrument: str
     quantity: int
@@ -19,29 +41,31 @@ class Holding:
 
     @classmethod
     def csv_headers(cls) -> list[str]:
-        return [f.name for f in fields(cls)]
+        return list(_field_names(cls))
 
     def to_csv_row(self) -> list[object]:
-        return [getattr(self, f.name) for f in fields(self)]
+        return list(_row_getter(type(self))(self))
 
     @classmethod
     def from_csv_row(cls, row: list[str]) -> Holding:
         """Parse a CSV row (list of strings) into a Holding."""
+        instrument, qty, avg_cost, ltp, cur_val, pnl, pnl_pct, day_chg, day_chg_pct, *rest = row
+        # Positional in field order: noticeably cheaper than keywords for bulk CSV loads
         return cls(
-            instrument=row[0],
-            quantity=int(row[1]),
-            avg_cost=float(row[2]),
-            ltp=float(row[3]),
-            current_value=float(row[4]),
-            pnl=float(row[5]),
-            pnl_percent=float(row[6]),
-            day_change=float(row[7]),
-            day_change_percent=float(row[8]),
-            exchange=row[9] if len(row) > 9 else "NSE",
+            instrument,
+            int(qty),
+            float(avg_cost),
+            float(ltp),
+            float(cur_val),
+            float(pnl),
+            float(pnl_pct),
+            float(day_chg),
+            float(day_chg_pct),
+            rest[0] if rest else "NSE",
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class SnapshotHolding:
     date: date
     instrument: str
@@ -58,28 +82,40 @@ class SnapshotHolding:
     @classmethod
     def from_sheet_row(cls, row: list[str]) -> SnapshotHolding:
         """Parse a Google Sheets row (date, instrument, qty, ...) into a SnapshotHolding."""
-        return cls(
-            date=date.fromisoformat(row[0]),
-            instrument=row[1],
-            quantity=int(row[2]),
-            avg_cost=float(row[3]),
-            ltp=float(row[4]),
-            current_value=float(row[5]),
-            pnl=float(row[6]),
-            pnl_percent=float(row[7]),
-            day_change=float(row[8]),
-            day_change_percent=float(row[9]),
-            exchange=row[10] if len(row) > 10 else "NSE",
+        return cls.from_sheet_rows([row], date.fromisoformat(row[0]))[0]
+
+    @classmethod
+    def from_sheet_rows(cls, rows: list[list[str]], snapshot_date: date) -> list[SnapshotHolding]:
+        """Parse one date's Holdings sheet rows column-wise, interning repeated strings."""
+        if not rows:
+            return []
+        # zip() truncates to the shortest row, so a short row would shift columns silently
+        for row in rows:
+            if len(row) < 10:
+                raise ValueError(
+                    f"Holdings row has {len(row)} columns, expected at least 10: {row}"
+                )
+        cols = list(zip(*rows, strict=False))
+        exchanges = [intern(row[10]) if len(row) > 10 else "NSE" for row in rows]
+        return list(
+            map(
+                cls,
+                repeat(snapshot_date),
+                map(intern, cols[1]),
+                map(int, cols[2]),
+                *(map(float, col) for col in cols[3:10]),
+                exchanges,
+            )
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Snapshot:
     date: date
     holdings: list[SnapshotHolding]
 
 
-@dataclass
+@dataclass(slots=True)
 class Transaction:
     date: date
     instrument: str
@@ -89,7 +125,7 @@ class Transaction:
     amount: float  # negative=cash out (buy), positive=cash in (sell)
 
 
-@dataclass
+@dataclass(slots=True)
 class PortfolioSummary:
     total_investment: float
     current_value: float
@@ -109,8 +145,10 @@ class PortfolioSummary:
                 num_holdings=0,
             )
 
-        current_value = sum(h.current_value for h in holdings)
-        total_pnl = sum(h.pnl for h in holdings)
+        current_value = total_pnl = 0.0
+        for h in holdings:
+            current_value += h.current_value
+            total_pnl += h.pnl
         total_investment = current_value - total_pnl
 
         return cls(
@@ -123,7 +161,7 @@ class PortfolioSummary:
 
     @classmethod
     def csv_headers(cls) -> list[str]:
-        return [f.name for f in fields(cls)]
+        return list(_field_names(cls))
 
     def to_csv_row(self) -> list[object]:
-        return [getattr(self, f.name) for f in fields(self)]
+        return list(_row_getter(type(self))(self))
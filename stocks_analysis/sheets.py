@@ -104,9 +104,16 @@ class SheetsClient:
         col_values = worksheet.col_values(1)
         # Collect 1-indexed row numbers that match, skipping header (row 1)
         matching_rows = [i + 1 for i, val in enumerate(col_values) if val == date_str and i > 0]
+        # Merge adjacent rows into runs so each run is one API call
+        runs: list[list[int]] = []
+        for row_num in matching_rows:
+            if runs and runs[-1][1] == row_num - 1:
+                runs[-1][1] = row_num
+            else:
+                runs.append([row_num, row_num])
         # Delete in reverse order to preserve indices
-        for row_num in reversed(matching_rows):
-            worksheet.delete_rows(row_num)
+        for start, end in reversed(runs):
+            worksheet.delete_rows(start, end)
 
     def upload_holdings(self, holdings: list[Holding], date_str: str | None = None) -> int:
         if not holdings:
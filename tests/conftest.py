@@ -1,3 +1,8 @@
+from collections.abc import Iterator
+from unittest.mock import MagicMock, patch
+
+import pytest
+
 from stocks_analysis.models import Holding
 
 
@@ -16,3 +21,46 @@ def make_holding(**overrides: object) -> Holding:
     }
     defaults.update(overrides)
     return Holding(**defaults)
+
+
+def make_sheet_rows() -> list[list[str]]:
+    """Two Holdings sheet rows for one date: one with an explicit exchange, one without."""
+    return [
+        [
+            "2025-01-15",
+            "RELIANCE",
+            "10",
+            "2450.5",
+            "2500.0",
+            "25000.0",
+            "495.0",
+            "2.02",
+            "15.0",
+            "0.6",
+            "BSE",
+        ],
+        ["2025-01-15", "TCS", "5", "3200.0", "3350.0", "16750.0", "750.0", "4.69", "50.0", "1.52"],
+    ]
+
+
+class _Ctx:
+    """Minimal context manager that yields a fixed object."""
+
+    def __init__(self, value: object) -> None:
+        self.value = value
+
+    def __enter__(self) -> object:
+        return self.value
+
+    def __exit__(self, *exc_info: object) -> bool:
+        return False
+
+
+@pytest.fixture
+def mock_kite_ctx() -> Iterator[tuple[MagicMock, MagicMock]]:
+    """Patch main.create_kite_fetcher; yield (mock_create, mock_fetcher) returning one holding."""
+    mock_fetcher = MagicMock()
+    mock_fetcher.fetch_holdings.return_value = [make_holding()]
+    with patch("stocks_analysis.main.create_kite_fetcher") as mock_create:
+        mock_create.return_value = _Ctx(mock_fetcher)
+        yield mock_create, mock_fetcher
@@ -3,10 +3,12 @@ from datetime import date
 import pytest
 
 from stocks_analysis.analysis import (
+    _estimate_buy_price,
     infer_transactions,
     parse_snapshots_from_rows,
 )
 from stocks_analysis.models import Snapshot, SnapshotHolding
+from tests.conftest import make_sheet_rows
 
 
 class TestParseSnapshotsFromRows:
@@ -148,10 +150,59 @@ class TestParseSnapshotsFromRows:
         assert snapshots[0].date == date(2025, 1, 15)
         assert snapshots[1].date == date(2025, 1, 20)
 
+    def test_interleaved_dates_grouped_together(self) -> None:
+        def row(dt: str, instrument: str) -> list[str]:
+            return [dt, instrument, "1", "100.0", "110.0", "110.0", "10.0", "10.0", "1.0", "0.9"]
+
+        rows = [
+            row("2025-01-20", "RELIANCE"),
+            row("2025-01-15", "RELIANCE"),
+            row("2025-01-20", "TCS"),
+            row("2025-01-15", "TCS"),
+        ]
+        snapshots = parse_snapshots_from_rows(rows)
+        assert [s.date for s in snapshots] == [date(2025, 1, 15), date(2025, 1, 20)]
+        assert [h.instrument for h in snapshots[0].holdings] == ["RELIANCE", "TCS"]
+        assert [h.instrument for h in snapshots[1].holdings] == ["RELIANCE", "TCS"]
+
     def test_empty_rows(self) -> None:
         snapshots = parse_snapshots_from_rows([])
         assert snapshots == []
 
+    def test_parses_all_fields_with_default_exchange(self) -> None:
+        holdings = parse_snapshots_from_rows(make_sheet_rows())[0].holdings
+        assert holdings[0] == SnapshotHolding(
+            date=date(2025, 1, 15),
+            instrument="RELIANCE",
+            quantity=10,
+            avg_cost=2450.5,
+            ltp=2500.0,
+            current_value=25000.0,
+            pnl=495.0,
+            pnl_percent=2.02,
+            day_change=15.0,
+            day_change_percent=0.6,
+            exchange="BSE",
+        )
+        assert holdings[1].quantity == 5
+        assert holdings[1].day_change_percent == 1.52
+        assert holdings[1].exchange == "NSE"
+
+    def test_short_row_raises(self) -> None:
+        rows = make_sheet_rows()
+        rows[1] = rows[1][:9]
+        with pytest.raises(ValueError, match="expected at least 10"):
+            parse_snapshots_from_rows(rows)
+
+
+class TestEstimateBuyPrice:
+    def test_price_from_cost_difference(self) -> None:
+        # (2460*15 - 2450.5*10) / 5 = 2479.0
+        assert _estimate_buy_price(10, 2450.5, 15, 2460.0) == pytest.approx(2479.0)
+
+    def test_non_positive_estimate_falls_back_to_avg_cost(self) -> None:
+        assert _estimate_buy_price(10, 5000.0, 12, 100.0) == 100.0
+
 
 def _make_snapshot_holding(
     dt: date,
@@ -160,14 +211,17 @@ def _make_snapshot_holding(
     avg_cost: float = 2450.5,
     ltp: float = 2500.0,
 ) -> SnapshotHolding:
+    current_value = ltp * quantity
+    cost_basis = avg_cost * quantity
+    pnl = current_value - cost_basis
     return SnapshotHolding(
         date=dt,
         instrument=instrument,
         quantity=quantity,
         avg_cost=avg_cost,
         ltp=ltp,
-        current_value=ltp * quantity,
-        pnl=(ltp - avg_cost) * quantity,
+        current_value=current_value,
+        pnl=pnl,
         pnl_percent=(ltp - avg_cost) / avg_cost * 100,
         day_change=0.0,
         day_change_percent=0.0,
@@ -270,6 +324,22 @@ class TestInferTransactions:
         assert sells[0].price == 2500.0  # previous LTP
         assert sells[0].amount == pytest.approx(7500.0)
 
+    def test_quantity_drops_to_zero(self) -> None:
+        """A zero-quantity row sells the whole previous position."""
+        snap1 = Snapshot(
+            date=date(2025, 1, 15),
+            holdings=[_make_snapshot_holding(date(2025, 1, 15), "RELIANCE", 10, 2450.5, 2500.0)],
+        )
+        snap2 = Snapshot(
+            date=date(2025, 1, 20),
+            holdings=[_make_snapshot_holding(date(2025, 1, 20), "RELIANCE", 0, 2450.5, 2550.0)],
+        )
+        txns = infer_transactions([snap1, snap2])
+        sells = [t for t in txns if t.date == date(2025, 1, 20)]
+        assert len(sells) == 1
+        assert sells[0].type == "SELL"
+        assert sells[0].quantity == 10
+
     def test_unchanged_position_no_transaction(self) -> None:
         """Same quantity + avg_cost → no transaction generated."""
         snap1 = Snapshot(
@@ -302,6 +372,41 @@ class TestInferTransactions:
         assert len(additional_buy) == 1
         assert additional_buy[0].price == 100.0  # falls back to curr.avg_cost
 
+    def test_mixed_changes_between_snapshots(self) -> None:
+        """New, disappeared, increased and unchanged instruments in one diff."""
+        d1, d2 = date(2025, 1, 15), date(2025, 1, 20)
+        snap1 = Snapshot(
+            date=d1,
+            holdings=[
+                _make_snapshot_holding(d1, "RELIANCE", 10, 2450.5, 2500.0),
+                _make_snapshot_holding(d1, "TCS", 5, 3200.0, 3350.0),
+                _make_snapshot_holding(d1, "INFY", 8, 1500.0, 1550.0),
+            ],
+        )
+        snap2 = Snapshot(
+            date=d2,
+            holdings=[
+                _make_snapshot_holding(d2, "RELIANCE", 10, 2450.5, 2550.0),
+                _make_snapshot_holding(d2, "INFY", 10, 1500.0, 1560.0),
+                _make_snapshot_holding(d2, "HDFC", 4, 1600.0, 1650.0),
+            ],
+        )
+        txns = [t for t in infer_transactions([snap1, snap2]) if t.date == d2]
+        assert sorted((t.instrument, t.type, t.quantity) for t in txns) == [
+            ("HDFC", "BUY", 4),
+            ("INFY", "BUY", 2),
+            ("TCS", "SELL", 5),
+        ]
+
+    def test_accepts_lazy_iterable(self) -> None:
+        d1, d2 = date(2025, 1, 15), date(2025, 1, 20)
+        snapshots = [
+            Snapshot(date=d1, holdings=[_make_snapshot_holding(d1, "RELIANCE", 10)]),
+            Snapshot(date=d2, holdings=[_make_snapshot_holding(d2, "RELIANCE", 7)]),
+        ]
+        txns = infer_transactions(iter(snapshots))
+        assert [(t.type, t.quantity) for t in txns] == [("BUY", 10), ("SELL", 3)]
+
     def test_empty_snapshots(self) -> None:
         txns = infer_transactions([])
         assert txns == []
@@ -1,56 +1,63 @@
 from unittest.mock import MagicMock
 
+import pytest
+from playwright.sync_api import Page
+
 from stocks_analysis.kite import (
+    _HOLDINGS_CELLS_JS,
+    _HOLDINGS_ROW_SELECTOR,
     _POST_LOGIN_URL_PATTERN,
     KITE_HOLDINGS_URL,
     KITE_LOGIN_URL,
     KiteFetcher,
-    _extract_row_data,
     _parse_quantity,
     _parse_tooltip_value,
+    _row_data_from_cells,
     parse_holding_row,
 )
 
 
+@pytest.fixture
+def page() -> MagicMock:
+    return MagicMock(spec=Page)
+
+
+@pytest.fixture
+def fetcher(page: MagicMock) -> KiteFetcher:
+    return KiteFetcher(page)
+
+
 class TestKiteFetcherInit:
-    def test_accepts_page_object(self) -> None:
-        page = MagicMock()
-        fetcher = KiteFetcher(page)
+    def test_accepts_page_object(self, page: MagicMock, fetcher: KiteFetcher) -> None:
         assert fetcher.page is page
 
 
 class TestOpenLoginPage:
-    def test_calls_goto_with_login_url(self) -> None:
-        page = MagicMock()
-        fetcher = KiteFetcher(page)
+    def test_calls_goto_with_login_url(self, page: MagicMock, fetcher: KiteFetcher) -> None:
         fetcher.open_login_page()
         page.goto.assert_called_once_with(KITE_LOGIN_URL)
 
 
 class TestWaitForLogin:
-    def test_calls_wait_for_url_with_default_timeout(self) -> None:
-        page = MagicMock()
-        fetcher = KiteFetcher(page)
+    def test_calls_wait_for_url_with_default_timeout(
+        self, page: MagicMock, fetcher: KiteFetcher
+    ) -> None:
         fetcher.wait_for_login()
         page.wait_for_url.assert_called_once_with(_POST_LOGIN_URL_PATTERN, timeout=300_000)
 
-    def test_calls_wait_for_url_with_custom_timeout(self) -> None:
-        page = MagicMock()
-        fetcher = KiteFetcher(page)
+    def test_calls_wait_for_url_with_custom_timeout(
+        self, page: MagicMock, fetcher: KiteFetcher
+    ) -> None:
         fetcher.wait_for_login(timeout_ms=60_000)
         page.wait_for_url.assert_called_once_with(_POST_LOGIN_URL_PATTERN, timeout=60_000)
 
 
 class TestNavigateToHoldings:
-    def test_goes_to_holdings_url(self) -> None:
-        page = MagicMock()
-        fetcher = KiteFetcher(page)
+    def test_goes_to_holdings_url(self, page: MagicMock, fetcher: KiteFetcher) -> None:
         fetcher.navigate_to_holdings()
         page.goto.assert_called_once_with(KITE_HOLDINGS_URL)
 
-    def test_waits_for_holdings_content(self) -> None:
-        page = MagicMock()
-        fetcher = KiteFetcher(page)
+    def test_waits_for_holdings_content(self, page: MagicMock, fetcher: KiteFetcher) -> None:
         fetcher.navigate_to_holdings()
         page.wait_for_load_state.assert_called_once_with("domcontentloaded")
         assert page.wait_for_selector.call_count == 2
@@ -107,6 +114,11 @@ class TestParseQuantity:
     def test_whitespace_padding(self) -> None:
         assert _parse_quantity("  20  ") == 20
 
+    def test_t_day_label_glued_to_digits(self) -> None:
+        """A label touching the preceding number still splits it off, not joins digits."""
+        assert _parse_quantity("10T1:3") == 13
+        assert _parse_quantity("T1:3T2:4 5") == 12
+
 
 class TestParseHoldingRow:
     def test_standard_row_with_commas_and_signs(self) -> None:
@@ -186,7 +198,7 @@ class TestParseHoldingRow:
         assert h.avg_cost == 450.00
 
 
-def _make_mock_row(
+def _make_cells(
     instrument: str = "RELIANCE",
     qty: str = "10",
     avg_cost: str = "2,450.50",
@@ -195,9 +207,9 @@ def _make_mock_row(
     pnl: str = "495.00",
     net_chg: str = "+2.02%",
     day_chg: str = "+0.60%",
-    day_chg_tooltip: str = "15.00 (+0.60%)",
-) -> MagicMock:
-    """Create a mock row element matching Kite's holdings DOM structure."""
+    day_chg_tooltip: str | None = "15.00 (+0.60%)",
+) -> list[dict[str, str | None]]:
+    """Create the per-cell payload _ROW_CELLS_JS returns for a Kite holdings row."""
     label_map = {
         "Instrument": instrument,
         "Qty.": qty,
@@ -208,36 +220,19 @@ def _make_mock_row(
         "Net chg.": net_chg,
         "Day chg.": day_chg,
     }
-
-    def mock_query_selector(selector: str) -> MagicMock | None:
-        # Day chg. tooltip span
-        if "Day chg." in selector and "data-tooltip-content" in selector:
-            span = MagicMock()
-            span.get_attribute.return_value = day_chg_tooltip
-            return span
-
-        # Regular data-label cells
-        for label, text in label_map.items():
-            if f'data-label="{label}"' in selector:
-                cell = MagicMock()
-                cell.inner_text.return_value = text
-                if label == "Instrument":
-                    name_span = MagicMock()
-                    name_span.inner_text.return_value = text
-                    cell.query_selector.return_value = name_span
-                return cell
-
-        return None
-
-    row = MagicMock()
-    row.query_selector = MagicMock(side_effect=mock_query_selector)
-    return row
+    return [
+        {
+            "label": label,
+            "text": text,
+            "tooltip": day_chg_tooltip if label == "Day chg." else None,
+        }
+        for label, text in label_map.items()
+    ]
 
 
-class TestExtractRowData:
+class TestRowDataFromCells:
     def test_extracts_all_fields(self) -> None:
-        row = _make_mock_row()
-        data = _extract_row_data(row)
+        data = _row_data_from_cells(_make_cells())
         assert data["instrument"] == "RELIANCE"
         assert data["quantity"] == "10"
         assert data["avg_cost"] == "2,450.50"
@@ -248,73 +243,48 @@ class TestExtractRowData:
         assert data["day_change"] == "15.00"
         assert data["day_change_percent"] == "+0.60%"
 
-    def test_missing_cell_raises(self) -> None:
-        import pytest
+    def test_strips_cell_text(self) -> None:
+        data = _row_data_from_cells(_make_cells(instrument="  RELIANCE\n", qty=" T1: 3\n3 "))
+        assert data["instrument"] == "RELIANCE"
+        assert data["quantity"] == "T1: 3\n3"
 
-        row = MagicMock()
-        row.query_selector.return_value = None
+    def test_missing_cell_raises(self) -> None:
         with pytest.raises(ValueError):
-            _extract_row_data(row)
+            _row_data_from_cells([])
+
+    def test_duplicate_label_uses_first_cell(self) -> None:
+        cells = _make_cells(qty="10")
+        cells.append({"label": "Qty.", "text": "99", "tooltip": None})
+        assert _row_data_from_cells(cells)["quantity"] == "10"
 
     def test_day_change_defaults_to_zero_without_tooltip(self) -> None:
-        def mock_qs(selector: str) -> MagicMock | None:
-            if "data-tooltip-content" in selector:
-                return None
-            for label in [
-                "Instrument",
-                "Qty.",
-                "Avg. cost",
-                "LTP",
-                "Cur. val",
-                "P&L",
-                "Net chg.",
-                "Day chg.",
-            ]:
-                if f'data-label="{label}"' in selector:
-                    cell = MagicMock()
-                    cell.inner_text.return_value = "0"
-                    if label == "Instrument":
-                        name_span = MagicMock()
-                        name_span.inner_text.return_value = "TEST"
-                        cell.query_selector.return_value = name_span
-                    return cell
-            return None
-
-        row = MagicMock()
-        row.query_selector = MagicMock(side_effect=mock_qs)
-        data = _extract_row_data(row)
+        data = _row_data_from_cells(_make_cells(day_chg_tooltip=None))
         assert data["day_change"] == "0"
 
 
 class TestFillLoginCredentials:
-    def test_fills_user_id_and_submits(self) -> None:
-        page = MagicMock()
-        fetcher = KiteFetcher(page)
+    def test_fills_user_id_and_submits(self, page: MagicMock, fetcher: KiteFetcher) -> None:
         fetcher.fill_login_credentials("AB1234", "secret123")
 
         page.fill.assert_any_call('input[type="text"]#userid', "AB1234")
         # Should click submit after filling user ID
         page.click.assert_any_call('button[type="submit"]')
 
-    def test_waits_for_password_field_then_fills(self) -> None:
-        page = MagicMock()
-        fetcher = KiteFetcher(page)
+    def test_waits_for_password_field_then_fills(
+        self, page: MagicMock, fetcher: KiteFetcher
+    ) -> None:
         fetcher.fill_login_credentials("AB1234", "secret123")
 
         page.wait_for_selector.assert_any_call('input[type="password"]', timeout=10_000)
         page.fill.assert_any_call('input[type="password"]', "secret123")
 
-    def test_submits_after_password(self) -> None:
-        page = MagicMock()
-        fetcher = KiteFetcher(page)
+    def test_submits_after_password(self, page: MagicMock, fetcher: KiteFetcher) -> None:
         fetcher.fill_login_credentials("AB1234", "secret123")
 
         # Should click submit twice: once for user ID, once for password
         assert page.click.call_count == 2
 
-    def test_calls_in_correct_order(self) -> None:
-        page = MagicMock()
-        fetcher = KiteFetcher(page)
+    def test_calls_in_correct_order(self, page: MagicMock, fetcher: KiteFetcher) -> None:
         fetcher.fill_login_credentials("AB1234", "secret123")
 
         expected_calls = [
@@ -343,51 +313,49 @@ class TestFillLoginCredentials:
 
 
 class TestFetchHoldings:
-    def test_single_holding(self) -> None:
-        page = MagicMock()
-        row = _make_mock_row()
-        page.query_selector_all.return_value = [row]
-        fetcher = KiteFetcher(page)
+    def test_single_holding(self, page: MagicMock, fetcher: KiteFetcher) -> None:
+        page.locator.return_value.evaluate_all.return_value = [_make_cells()]
         holdings = fetcher.fetch_holdings()
         assert len(holdings) == 1
         assert holdings[0].instrument == "RELIANCE"
         assert holdings[0].quantity == 10
 
-    def test_empty_holdings(self) -> None:
-        page = MagicMock()
-        page.query_selector_all.return_value = []
-        fetcher = KiteFetcher(page)
+    def test_single_round_trip_for_all_rows(self, page: MagicMock, fetcher: KiteFetcher) -> None:
+        rows = page.locator.return_value
+        rows.evaluate_all.return_value = [_make_cells(), _make_cells(instrument="TCS")]
+        fetcher.fetch_holdings()
+        page.locator.assert_called_once_with(_HOLDINGS_ROW_SELECTOR)
+        rows.evaluate_all.assert_called_once_with(_HOLDINGS_CELLS_JS)
+        page.query_selector_all.assert_not_called()
+
+    def test_empty_holdings(self, page: MagicMock, fetcher: KiteFetcher) -> None:
+        page.locator.return_value.evaluate_all.return_value = []
         holdings = fetcher.fetch_holdings()
         assert holdings == []
 
-    def test_multiple_holdings(self) -> None:
-        page = MagicMock()
-        row1 = _make_mock_row(instrument="RELIANCE")
-        row2 = _make_mock_row(
-            instrument="TCS",
-            qty="5",
-            avg_cost="3,200.00",
-            ltp="3,300.00",
-            cur_val="16,500.00",
-            pnl="500.00",
-            net_chg="+3.13%",
-            day_chg="+1.54%",
-            day_chg_tooltip="50.00 (+1.54%)",
-        )
-        page.query_selector_all.return_value = [row1, row2]
-        fetcher = KiteFetcher(page)
+    def test_multiple_holdings(self, page: MagicMock, fetcher: KiteFetcher) -> None:
+        page.locator.return_value.evaluate_all.return_value = [
+            _make_cells(instrument="RELIANCE"),
+            _make_cells(
+                instrument="TCS",
+                qty="5",
+                avg_cost="3,200.00",
+                ltp="3,300.00",
+                cur_val="16,500.00",
+                pnl="500.00",
+                net_chg="+3.13%",
+                day_chg="+1.54%",
+                day_chg_tooltip="50.00 (+1.54%)",
+            ),
+        ]
         holdings = fetcher.fetch_holdings()
         assert len(holdings) == 2
         assert holdings[0].instrument == "RELIANCE"
         assert holdings[1].instrument == "TCS"
 
-    def test_skips_malformed_row(self) -> None:
-        page = MagicMock()
-        good_row = _make_mock_row()
-        bad_row = MagicMock()
-        bad_row.query_selector.return_value = None  # missing cells
-        page.query_selector_all.return_value = [good_row, bad_row]
-        fetcher = KiteFetcher(page)
+    def test_skips_malformed_row(self, page: MagicMock, fetcher: KiteFetcher) -> None:
+        # second row has no cells
+        page.locator.return_value.evaluate_all.return_value = [_make_cells(), []]
         holdings = fetcher.fetch_holdings()
         assert len(holdings) == 1
         assert holdings[0].instrument == "RELIANCE"
@@ -3,9 +3,15 @@ from datetime import date
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
+import pytest
+
 from stocks_analysis.main import (
     _extract_date_from_filename,
     _scrape,
+    _setup,
+    _upload_csv_to_sheets,
+    _upload_to_sheets_if_configured,
+    create_sheets_client,
     load_holdings_from_csv,
     run,
     save_holdings_to_csv,
@@ -13,40 +19,38 @@ from stocks_analysis.main import (
 from stocks_analysis.models import Holding
 from tests.conftest import make_holding
 
+_SAMPLE_HOLDINGS = [make_holding(), make_holding(instrument="TCS")]
+
+
+@pytest.fixture(scope="module")
+def sample_csv(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """One holdings CSV shared by the read-only tests in this module."""
+    return save_holdings_to_csv(_SAMPLE_HOLDINGS, output_dir=tmp_path_factory.mktemp("csv"))
+
 
 class TestSaveHoldingsToCsv:
-    def test_creates_csv_file(self, tmp_path: Path) -> None:
-        holdings = [make_holding()]
-        path = save_holdings_to_csv(holdings, output_dir=tmp_path)
-        assert path.exists()
-        assert path.suffix == ".csv"
+    def test_creates_csv_file(self, sample_csv: Path) -> None:
+        assert sample_csv.exists()
+        assert sample_csv.suffix == ".csv"
 
-    def test_filename_has_timestamp(self, tmp_path: Path) -> None:
-        holdings = [make_holding()]
-        path = save_holdings_to_csv(holdings, output_dir=tmp_path)
-        assert path.name.startswith("holdings_")
-        assert path.name.endswith(".csv")
+    def test_filename_has_timestamp(self, sample_csv: Path) -> None:
+        assert sample_csv.name.startswith("holdings_")
+        assert sample_csv.name.endswith(".csv")
 
-    def test_csv_has_correct_headers(self, tmp_path: Path) -> None:
-        holdings = [make_holding()]
-        path = save_holdings_to_csv(holdings, output_dir=tmp_path)
-        with open(path) as f:
+    def test_csv_has_correct_headers(self, sample_csv: Path) -> None:
+        with open(sample_csv) as f:
             reader = csv.reader(f)
             headers = next(reader)
         assert headers == Holding.csv_headers()
 
-    def test_csv_row_count(self, tmp_path: Path) -> None:
-        holdings = [make_holding(), make_holding(instrument="TCS")]
-        path = save_holdings_to_csv(holdings, output_dir=tmp_path)
-        with open(path) as f:
+    def test_csv_row_count(self, sample_csv: Path) -> None:
+        with open(sample_csv) as f:
             reader = csv.reader(f)
             rows = list(reader)
         assert len(rows) == 3  # 1 header + 2 data rows
 
-    def test_csv_row_values(self, tmp_path: Path) -> None:
-        holdings = [make_holding()]
-        path = save_holdings_to_csv(holdings, output_dir=tmp_path)
-        with open(path) as f:
+    def test_csv_row_values(self, sample_csv: Path) -> None:
+        with open(sample_csv) as f:
             reader = csv.reader(f)
             next(reader)  # skip header
             row = next(reader)
@@ -71,19 +75,14 @@ class TestSaveHoldingsToCsv:
 
 
 class TestLoadHoldingsFromCsv:
-    def test_reads_csv_and_returns_holdings(self, tmp_path: Path) -> None:
-        holdings = [make_holding(), make_holding(instrument="TCS")]
-        csv_path = save_holdings_to_csv(holdings, output_dir=tmp_path)
-        loaded = load_holdings_from_csv(csv_path)
+    def test_reads_csv_and_returns_holdings(self, sample_csv: Path) -> None:
+        loaded = load_holdings_from_csv(sample_csv)
         assert len(loaded) == 2
         assert loaded[0].instrument == "RELIANCE"
         assert loaded[1].instrument == "TCS"
 
-    def test_round_trip_preserves_data(self, tmp_path: Path) -> None:
-        original = [make_holding()]
-        csv_path = save_holdings_to_csv(original, output_dir=tmp_path)
-        loaded = load_holdings_from_csv(csv_path)
-        assert loaded == original
+    def test_round_trip_preserves_data(self, sample_csv: Path) -> None:
+        assert load_holdings_from_csv(sample_csv) == _SAMPLE_HOLDINGS
 
     def test_empty_csv_returns_empty_list(self, tmp_path: Path) -> None:
         csv_path = save_holdings_to_csv([], output_dir=tmp_path)
@@ -93,15 +92,15 @@ class TestLoadHoldingsFromCsv:
 
 class TestScrape:
     @patch("stocks_analysis.main._upload_to_sheets_if_configured")
-    @patch("stocks_analysis.main.create_kite_fetcher")
     @patch("stocks_analysis.main.save_holdings_to_csv")
     def test_calls_methods_in_order(
-        self, mock_save: MagicMock, mock_create: MagicMock, mock_upload: MagicMock, tmp_path: Path
+        self,
+        mock_save: MagicMock,
+        mock_upload: MagicMock,
+        mock_kite_ctx: tuple[MagicMock, MagicMock],
+        tmp_path: Path,
     ) -> None:
-        mock_fetcher = MagicMock()
-        mock_fetcher.fetch_holdings.return_value = [make_holding()]
-        mock_create.return_value.__enter__ = MagicMock(return_value=mock_fetcher)
-        mock_create.return_value.__exit__ = MagicMock(return_value=False)
+        _, mock_fetcher = mock_kite_ctx
         mock_save.return_value = tmp_path / "holdings_test.csv"
 
         _scrape()
@@ -113,16 +112,17 @@ class TestScrape:
         mock_save.assert_called_once()
 
     @patch("stocks_analysis.main._upload_to_sheets_if_configured")
-    @patch("stocks_analysis.main.create_kite_fetcher")
     @patch("stocks_analysis.main.save_holdings_to_csv")
     def test_passes_holdings_to_save(
-        self, mock_save: MagicMock, mock_create: MagicMock, mock_upload: MagicMock, tmp_path: Path
+        self,
+        mock_save: MagicMock,
+        mock_upload: MagicMock,
+        mock_kite_ctx: tuple[MagicMock, MagicMock],
+        tmp_path: Path,
     ) -> None:
-        mock_fetcher = MagicMock()
+        _, mock_fetcher = mock_kite_ctx
         holdings = [make_holding(instrument="TCS")]
         mock_fetcher.fetch_holdings.return_value = holdings
-        mock_create.return_value.__enter__ = MagicMock(return_value=mock_fetcher)
-        mock_create.return_value.__exit__ = MagicMock(return_value=False)
         mock_save.return_value = tmp_path / "holdings_test.csv"
 
         _scrape()
@@ -147,8 +147,6 @@ class TestExtractDateFromFilename:
 class TestUploadCsvToSheets:
     @patch("stocks_analysis.main.create_sheets_client")
     def test_loads_and_uploads(self, mock_create_client: MagicMock, tmp_path: Path) -> None:
-        from stocks_analysis.main import _upload_csv_to_sheets
-
         mock_client = MagicMock()
         mock_create_client.return_value = mock_client
         mock_client.upload_holdings.return_value = 2
@@ -174,10 +172,6 @@ class TestUploadCsvToSheets:
     def test_raises_when_env_vars_missing(
         self, mock_create_client: MagicMock, tmp_path: Path
     ) -> None:
-        import pytest
-
-        from stocks_analysis.main import _upload_csv_to_sheets
-
         mock_create_client.side_effect = ValueError("GOOGLE_SHEETS_CREDENTIALS not set")
         csv_path = save_holdings_to_csv([make_holding()], output_dir=tmp_path)
 
@@ -194,8 +188,6 @@ class TestUploadCsvToSheets:
         mock_infer: MagicMock,
         tmp_path: Path,
     ) -> None:
-        from stocks_analysis.main import _upload_csv_to_sheets
-
         mock_client = MagicMock()
         mock_create_client.return_value = mock_client
         mock_client.upload_holdings.return_value = 1
@@ -252,16 +244,16 @@ class TestRunWithSubcommands:
 
 class TestScrapeAutoFill:
     @patch("stocks_analysis.main._upload_to_sheets_if_configured")
-    @patch("stocks_analysis.main.create_kite_fetcher")
     @patch("stocks_analysis.main.save_holdings_to_csv")
     @patch.dict("os.environ", {"KITE_USER_ID": "AB1234", "KITE_PASSWORD": "secret123"}, clear=False)
     def test_calls_fill_login_credentials_when_env_vars_set(
-        self, mock_save: MagicMock, mock_create: MagicMock, mock_upload: MagicMock, tmp_path: Path
+        self,
+        mock_save: MagicMock,
+        mock_upload: MagicMock,
+        mock_kite_ctx: tuple[MagicMock, MagicMock],
+        tmp_path: Path,
     ) -> None:
-        mock_fetcher = MagicMock()
-        mock_fetcher.fetch_holdings.return_value = [make_holding()]
-        mock_create.return_value.__enter__ = MagicMock(return_value=mock_fetcher)
-        mock_create.return_value.__exit__ = MagicMock(return_value=False)
+        _, mock_fetcher = mock_kite_ctx
         mock_save.return_value = tmp_path / "holdings_test.csv"
 
         _scrape()
@@ -269,16 +261,16 @@ class TestScrapeAutoFill:
         mock_fetcher.fill_login_credentials.assert_called_once_with("AB1234", "secret123")
 
     @patch("stocks_analysis.main._upload_to_sheets_if_configured")
-    @patch("stocks_analysis.main.create_kite_fetcher")
     @patch("stocks_analysis.main.save_holdings_to_csv")
     @patch.dict("os.environ", {}, clear=True)
     def test_skips_fill_when_env_vars_missing(
-        self, mock_save: MagicMock, mock_create: MagicMock, mock_upload: MagicMock, tmp_path: Path
+        self,
+        mock_save: MagicMock,
+        mock_upload: MagicMock,
+        mock_kite_ctx: tuple[MagicMock, MagicMock],
+        tmp_path: Path,
     ) -> None:
-        mock_fetcher = MagicMock()
-        mock_fetcher.fetch_holdings.return_value = [make_holding()]
-        mock_create.return_value.__enter__ = MagicMock(return_value=mock_fetcher)
-        mock_create.return_value.__exit__ = MagicMock(return_value=False)
+        _, mock_fetcher = mock_kite_ctx
         mock_save.return_value = tmp_path / "holdings_test.csv"
 
         _scrape()
@@ -286,16 +278,16 @@ class TestScrapeAutoFill:
         mock_fetcher.fill_login_credentials.assert_not_called()
 
     @patch("stocks_analysis.main._upload_to_sheets_if_configured")
-    @patch("stocks_analysis.main.create_kite_fetcher")
     @patch("stocks_analysis.main.save_holdings_to_csv")
     @patch.dict("os.environ", {"KITE_USER_ID": "AB1234"}, clear=True)
     def test_skips_fill_when_only_user_id_set(
-        self, mock_save: MagicMock, mock_create: MagicMock, mock_upload: MagicMock, tmp_path: Path
+        self,
+        mock_save: MagicMock,
+        mock_upload: MagicMock,
+        mock_kite_ctx: tuple[MagicMock, MagicMock],
+        tmp_path: Path,
     ) -> None:
-        mock_fetcher = MagicMock()
-        mock_fetcher.fetch_holdings.return_value = [make_holding()]
-        mock_create.return_value.__enter__ = MagicMock(return_value=mock_fetcher)
-        mock_create.return_value.__exit__ = MagicMock(return_value=False)
+        _, mock_fetcher = mock_kite_ctx
         mock_save.return_value = tmp_path / "holdings_test.csv"
 
         _scrape()
@@ -312,12 +304,17 @@ class TestRunLoadsDotenv:
         mock_dotenv.assert_called_once()
 
 
+class TestCreateSheetsClient:
+    @patch("stocks_analysis.sheets.create_sheets_client")
+    def test_delegates_to_sheets_module(self, mock_create_client: MagicMock) -> None:
+        assert create_sheets_client() is mock_create_client.return_value
+        mock_create_client.assert_called_once_with()
+
+
 class TestUploadToSheetsIfConfigured:
     @patch("stocks_analysis.main.create_sheets_client")
     @patch.dict("os.environ", {"GOOGLE_SHEETS_CREDENTIALS": "/tmp/c.json", "GOOGLE_SHEET_ID": "x"})
     def test_uploads_when_configured(self, mock_create_client: MagicMock) -> None:
-        from stocks_analysis.main import _upload_to_sheets_if_configured
-
         mock_client = MagicMock()
         mock_create_client.return_value = mock_client
         mock_client.upload_holdings.return_value = 1
@@ -331,16 +328,12 @@ class TestUploadToSheetsIfConfigured:
 
     @patch.dict("os.environ", {}, clear=True)
     def test_silently_skips_when_not_configured(self) -> None:
-        from stocks_analysis.main import _upload_to_sheets_if_configured
-
         # Should not raise
         _upload_to_sheets_if_configured([make_holding()])
 
     @patch("stocks_analysis.main.create_sheets_client")
     @patch.dict("os.environ", {"GOOGLE_SHEETS_CREDENTIALS": "/tmp/c.json", "GOOGLE_SHEET_ID": "x"})
     def test_logs_warning_on_failure(self, mock_create_client: MagicMock) -> None:
-        from stocks_analysis.main import _upload_to_sheets_if_configured
-
         mock_create_client.side_effect = Exception("connection failed")
 
         with patch("stocks_analysis.main.logger") as mock_logger:
@@ -348,16 +341,17 @@ class TestUploadToSheetsIfConfigured:
             mock_logger.warning.assert_called_once()
 
     @patch("stocks_analysis.main._upload_to_sheets_if_configured")
-    @patch("stocks_analysis.main.create_kite_fetcher")
     @patch("stocks_analysis.main.save_holdings_to_csv")
     def test_scrape_calls_upload(
-        self, mock_save: MagicMock, mock_create: MagicMock, mock_upload: MagicMock, tmp_path: Path
+        self,
+        mock_save: MagicMock,
+        mock_upload: MagicMock,
+        mock_kite_ctx: tuple[MagicMock, MagicMock],
+        tmp_path: Path,
     ) -> None:
-        mock_fetcher = MagicMock()
+        _, mock_fetcher = mock_kite_ctx
         holdings = [make_holding()]
         mock_fetcher.fetch_holdings.return_value = holdings
-        mock_create.return_value.__enter__ = MagicMock(return_value=mock_fetcher)
-        mock_create.return_value.__exit__ = MagicMock(return_value=False)
         mock_save.return_value = tmp_path / "holdings_test.csv"
 
         _scrape()
@@ -376,8 +370,6 @@ class TestSetupSubcommand:
 class TestSetup:
     @patch("stocks_analysis.main.create_sheets_client")
     def test_setup_calls_setup_all(self, mock_create_client: MagicMock) -> None:
-        from stocks_analysis.main import _setup
-
         mock_client = MagicMock()
         mock_create_client.return_value = mock_client
 
@@ -1,4 +1,4 @@
-from dataclasses import asdict
+from dataclasses import asdict, dataclass
 from datetime import date
 
 import pytest
@@ -9,8 +9,9 @@ from stocks_analysis.models import (
     Snapshot,
     SnapshotHolding,
     Transaction,
+    _row_getter,
 )
-from tests.conftest import make_holding
+from tests.conftest import make_holding, make_sheet_rows
 
 
 class TestHoldingCreation:
@@ -84,6 +85,10 @@ class TestHoldingCsvMethods:
         for header, value in zip(headers, row, strict=True):
             assert getattr(h, header) == value
 
+    def test_csv_headers_returns_fresh_list(self) -> None:
+        Holding.csv_headers().append("extra")
+        assert "extra" not in Holding.csv_headers()
+
 
 class TestHoldingFromCsvRow:
     def test_round_trip(self) -> None:
@@ -229,6 +234,24 @@ class TestSnapshotHolding:
         sh = SnapshotHolding.from_sheet_row(row)
         assert sh.exchange == "NSE"
 
+    def test_from_sheet_row_short_row_raises(self) -> None:
+        with pytest.raises(ValueError, match="expected at least 10"):
+            SnapshotHolding.from_sheet_row(make_sheet_rows()[0][:9])
+
+    def test_from_sheet_rows_matches_from_sheet_row(self) -> None:
+        rows = make_sheet_rows()
+        parsed = SnapshotHolding.from_sheet_rows(rows, date(2025, 1, 15))
+        assert parsed == [SnapshotHolding.from_sheet_row(row) for row in rows]
+
+    def test_from_sheet_rows_short_row_raises(self) -> None:
+        rows = make_sheet_rows()
+        rows[0] = rows[0][:9]
+        with pytest.raises(ValueError, match="expected at least 10"):
+            SnapshotHolding.from_sheet_rows(rows, date(2025, 1, 15))
+
+    def test_from_sheet_rows_empty(self) -> None:
+        assert SnapshotHolding.from_sheet_rows([], date(2025, 1, 15)) == []
+
 
 class TestSnapshot:
     def test_create(self) -> None:
@@ -275,3 +298,16 @@ class TestTransaction:
         )
         assert t.type == "SELL"
         assert t.amount > 0  # cash in
+
+
+class TestRowGetter:
+    def test_single_field_dataclass_returns_tuple(self) -> None:
+        @dataclass
+        class One:
+            value: int
+
+        assert _row_getter(One)(One(7)) == (7,)
+
+    def test_multi_field_returns_values_in_field_order(self) -> None:
+        h = make_holding()
+        assert _row_getter(Holding)(h) == tuple(h.to_csv_row())
@@ -95,7 +95,22 @@ class TestDeleteRowsForDate:
 
         client._delete_rows_for_date(mock_ws, "2024-01-15")
         # Should delete row 4 first, then row 2 (reverse order to preserve indices)
-        assert mock_ws.delete_rows.call_args_list == [call(4), call(2)]
+        assert mock_ws.delete_rows.call_args_list == [call(4, 4), call(2, 2)]
+
+    def test_deletes_adjacent_rows_in_one_call(self, client: SheetsClient) -> None:
+        mock_ws = MagicMock()
+        mock_ws.col_values.return_value = [
+            "date",
+            "2024-01-14",
+            "2024-01-15",
+            "2024-01-15",
+            "2024-01-15",
+            "2024-01-16",
+            "2024-01-15",
+        ]
+
+        client._delete_rows_for_date(mock_ws, "2024-01-15")
+        assert mock_ws.delete_rows.call_args_list == [call(7, 7), call(3, 5)]
 
     def test_no_deletion_when_no_match(self, client: SheetsClient) -> None:
         mock_ws = MagicMock()
@@ -163,7 +178,7 @@ class TestUploadHoldings:
         mock_spreadsheet.worksheet.return_value = mock_ws
 
         client.upload_holdings([make_holding()], date_str="2024-01-15")
-        mock_ws.delete_rows.assert_called_once_with(2)
+        mock_ws.delete_rows.assert_called_once_with(2, 2)
 
     @patch("stocks_analysis.sheets._apply_alternating_date_colors")
     @patch("stocks_analysis.sheets._format_header_row")
@@ -257,7 +272,7 @@ class TestUploadSummary:
 
         summary = PortfolioSummary.from_holdings([make_holding()])
         client.upload_summary(summary, date_str="2024-01-15")
-        mock_ws.delete_rows.assert_called_once_with(2)
+        mock_ws.delete_rows.assert_called_once_with(2, 2)
 
 
 class TestColLetter: